@@ -0,0 +1,240 @@
+"""
+Tests for load_poc_data's database-free parts.
+
+Transforms take source DataFrames (or GeoJSON feature dicts) and return
+typed frames shaped like the target tables; validation and GeoJSON
+reading are plain Python too.
+"""
+import datetime
+import json
+import struct
+
+import pandas as pd
+import pytest
+
+import load_poc_data as L
+
+
+def dropin_csv(**overrides):
+    row = {
+        '_id': 1, 'Location ID': 743, 'Course_ID': 100155,
+        'Course Title': 'Lane Swim', 'Section': 'Swim - Drop-In',
+        'Age Min': 7.0, 'Age Max': None, 'Date Range': '2025-10-06 to 2025-11-10',
+        'Start Hour': 7, 'Start Minute': 5, 'End Hour': 8.0, 'End Min': None,
+        'First Date': '2025-10-06', 'Last Date': '2025-11-10', 'DayOftheWeek': ' monday ',
+    }
+    row.update(overrides)
+    return pd.DataFrame([row])
+
+
+def test_transform_dropins_builds_typed_columns():
+    out = L.transform_dropins(dropin_csv())
+    row = out.iloc[0]
+    assert list(out.columns) == list(L.DROPIN_COLUMNS)
+    assert row['location_id'] == '743'  # whole-number IDs lose '.0'
+    assert str(out['age_min'].dtype) == 'Int64' and row['age_min'] == 7
+    assert pd.isna(row['age_max'])
+    assert row['start_time'] == '07:05:00'
+    assert row['end_time'] == '08:00:00'  # missing minutes are 0
+    assert row['first_date'] == datetime.date(2025, 10, 6)
+    assert row['weekday'] == 0
+    assert row['activity'] == 'Swimming' and row['activity_category'] == 'Aquatics'
+    assert row['source_key'] == '100155|Swim - Drop-In|2025-10-06|07:05:00'
+
+
+def test_transform_dropins_missing_values_stay_missing():
+    out = L.transform_dropins(dropin_csv(**{'Start Hour': None, 'First Date': 'not a date', 'DayOftheWeek': 'Someday'}))
+    row = out.iloc[0]
+    assert pd.isna(row['start_time'])
+    assert pd.isna(row['first_date'])
+    assert pd.isna(row['weekday'])
+
+
+def test_transform_registered_tolerates_missing_columns():
+    df = pd.DataFrame([{
+        'Location ID': 12, 'Course_ID': 5, 'Section': 'Arts', 'Course Title': 'Pottery Wheel',
+        'Days of The Week': 'Tue', 'From To': 'Oct 1 to Nov 5', 'Start Hour': 18, 'Start Min': 30,
+    }])
+    out = L.transform_registered(df)
+    row = out.iloc[0]
+    assert list(out.columns) == list(L.REGISTERED_COLUMNS)
+    assert pd.isna(row['activity_title']) and pd.isna(row['min_age'])
+    assert row['source_key'] == '5|Arts|Tue|Oct 1 to Nov 5|18|30'
+
+
+def test_transform_facilities_keys_on_source_id():
+    df = pd.DataFrame([{'_id': 9, 'Facility ID': 2523.0, 'Location ID': 1, 'Facility Type (Display Name)': 'Pool'}])
+    row = L.transform_facilities(df).iloc[0]
+    assert row['source_key'] == '9'
+    assert row['facility_id'] == '2523'
+    assert row['facility_type'] == 'Pool'
+
+
+def location_feature(location_id, asset_id, lon, lat, multi=True):
+    point = [lon, lat]
+    return {
+        'type': 'Feature',
+        'properties': {'LOCATIONID': location_id, 'ASSET_ID': asset_id, 'ASSET_NAME': f'Asset {asset_id}'},
+        'geometry': {'type': 'MultiPoint', 'coordinates': [point]} if multi else {'type': 'Point', 'coordinates': point},
+    }
+
+
+def test_transform_locations_merges_details_and_takes_latest_point():
+    features = [
+        location_feature(1, 10, -79.1, 43.1),
+        location_feature(2, 20, -79.2, 43.2, multi=False),
+        location_feature(1, 11, -79.3, 43.3),
+    ]
+    csv_df = pd.DataFrame([
+        {'Location ID': 1, 'Location Name': 'Old Name', 'District': 'north york'},
+        {'Location ID': 1, 'Location Name': 'Park One', 'District': 'north york'},
+    ])
+    out, matched = L.transform_locations(iter(features), csv_df)
+    assert matched == 1
+    assert list(out['location_id']) == ['1', '2']
+    one = out.iloc[0]
+    assert one['asset_id'] == 11
+    assert one['geom'] == 'SRID=4326;POINT(-79.3 43.3)'
+    assert one['location_name'] == 'Park One'
+    assert one['district'] == 'North York'
+    assert pd.isna(out.iloc[1]['location_name'])
+
+
+def test_transform_wards_encodes_multipolygons():
+    ring = [[0, 0], [1, 0], [1, 1], [0, 0]]
+    feature = {
+        'properties': {'AREA_ID': 7.0, 'AREA_NAME': 'Ward 7'},
+        'geometry': {'type': 'Polygon', 'coordinates': [ring]},
+    }
+    out = L.transform_wards([feature])
+    assert list(out.columns) == list(L.WARD_COLUMNS)
+    assert out.iloc[0]['area_id'] == 7
+    geom = bytes.fromhex(out.iloc[0]['geom'])
+    assert geom == L.geometry_wkb(L.as_multi(feature['geometry']), srid=4326)
+
+
+def test_row_hash_tracks_content_only():
+    a = L.add_row_hash(pd.DataFrame({'x': [1, 2], 'y': ['a', 'b']}))
+    b = L.add_row_hash(pd.DataFrame({'x': [1, 2], 'y': ['a', 'c']}))
+    assert a['row_hash'].dtype == 'int64'
+    assert a['row_hash'][0] == b['row_hash'][0]
+    assert a['row_hash'][1] != b['row_hash'][1]
+    # An existing row_hash column is not part of the content
+    again = L.add_row_hash(a.copy())
+    assert list(again['row_hash']) == list(a['row_hash'])
+
+
+def test_row_hash_is_stable_across_runs():
+    frame = L.transform_dropins(dropin_csv())
+    assert list(frame['row_hash']) == list(L.transform_dropins(dropin_csv())['row_hash'])
+
+
+def test_reject_share_check_is_opt_in(monkeypatch, tmp_path):
+    monkeypatch.setattr(L, 'REJECTS_REPORT_PATH', str(tmp_path / 'rejects.json'))
+    L.check_reject_share('facilities', 100, 90)  # disabled by default
+    monkeypatch.setattr(L, 'MAX_REJECT_SHARE', 0.1)
+    L.check_reject_share('facilities', 100, 10)
+    with pytest.raises(RuntimeError, match='11 of 100'):
+        L.check_reject_share('facilities', 100, 11)
+
+
+def write_geojson(tmp_path, text):
+    path = tmp_path / 'layer.geojson'
+    path.write_text(text)
+    return str(path)
+
+
+def test_geojson_features_survive_every_chunk_boundary(tmp_path):
+    features = [
+        {'type': 'Feature', 'properties': {'name': 'brace } in { a "string"', 'path': 'C:\\\\{x}\\\\'}},
+        {'type': 'Feature', 'properties': {'quote': '\\"', 'nested': {'a': [1, {'b': 2}]}}},
+        {'type': 'Feature', 'properties': {'unicode': 'caf\u00e9 \\u00e9'}},
+    ]
+    text = '{"type": "FeatureCollection", "features": [\n ' + ' ,\n '.join(json.dumps(f) for f in features) + '\n]}'
+    path = write_geojson(tmp_path, text)
+    expected = json.loads(text)['features']
+    for chunk_size in range(1, 40):
+        assert list(L.iter_geojson_features(path, chunk_size)) == expected, chunk_size
+
+
+def test_geojson_empty_features_array(tmp_path):
+    path = write_geojson(tmp_path, '{"type": "FeatureCollection", "features": [ ]}')
+    assert list(L.iter_geojson_features(path, 4)) == []
+
+
+@pytest.mark.parametrize('text', [
+    '{"type": "FeatureCollection", "features": [{"type": "Feature", "properties": {"a": "}',
+    '{"type": "FeatureCollection", "features": [{"type": "Feature"},',
+    '{"type": "FeatureCollection"}',
+])
+def test_geojson_truncated_input_raises(tmp_path, text):
+    path = write_geojson(tmp_path, text)
+    with pytest.raises(ValueError):
+        list(L.iter_geojson_features(path, 8))
+
+
+def read_wkb(data, offset=0):
+    """Decode little-endian (E)WKB back to a GeoJSON geometry dict; returns (geometry, srid, end)."""
+    names = {code: name for name, code in L.WKB_TYPES.items()}
+    byte_order, code = struct.unpack_from('<BI', data, offset)
+    assert byte_order == 1
+    offset += 5
+    srid = None
+    if code & L.EWKB_SRID_FLAG:
+        (srid,) = struct.unpack_from('<I', data, offset)
+        offset += 4
+    gtype = names[code & ~L.EWKB_SRID_FLAG]
+
+    def points(offset):
+        (n,) = struct.unpack_from('<I', data, offset)
+        flat = struct.unpack_from(f'<{2 * n}d', data, offset + 4)
+        return [list(flat[i:i + 2]) for i in range(0, 2 * n, 2)], offset + 4 + 16 * n
+
+    if gtype == 'Point':
+        return {'type': gtype, 'coordinates': list(struct.unpack_from('<2d', data, offset))}, srid, offset + 16
+    if gtype == 'LineString':
+        coords, offset = points(offset)
+        return {'type': gtype, 'coordinates': coords}, srid, offset
+    (n,) = struct.unpack_from('<I', data, offset)
+    offset += 4
+    parts = []
+    for _ in range(n):
+        if gtype == 'Polygon':
+            part, offset = points(offset)
+        else:
+            part, _, offset = read_wkb(data, offset)
+        parts.append(part)
+    if gtype == 'GeometryCollection':
+        return {'type': gtype, 'geometries': parts}, srid, offset
+    if gtype != 'Polygon':
+        parts = [part['coordinates'] for part in parts]
+    return {'type': gtype, 'coordinates': parts}, srid, offset
+
+
+RING = [[-79.5, 43.6], [-79.4, 43.6], [-79.4, 43.7], [-79.5, 43.6]]
+HOLE = [[-79.46, 43.63], [-79.44, 43.63], [-79.44, 43.65], [-79.46, 43.63]]
+
+
+@pytest.mark.parametrize('geometry', [
+    {'type': 'Point', 'coordinates': [-79.38, 43.65]},
+    {'type': 'LineString', 'coordinates': RING[:3]},
+    {'type': 'Polygon', 'coordinates': [RING, HOLE]},
+    {'type': 'MultiPoint', 'coordinates': RING[:2]},
+    {'type': 'MultiLineString', 'coordinates': [RING[:2], HOLE[:3]]},
+    {'type': 'MultiPolygon', 'coordinates': [[RING], [HOLE]]},
+    {'type': 'GeometryCollection', 'geometries': [
+        {'type': 'Point', 'coordinates': [1.0, 2.0]}, {'type': 'LineString', 'coordinates': RING[:2]},
+    ]},
+])
+@pytest.mark.parametrize('srid', [None, 4326])
+def test_geometry_wkb_round_trips(geometry, srid):
+    data = L.geometry_wkb(geometry, srid=srid)
+    decoded, decoded_srid, end = read_wkb(data)
+    assert decoded == geometry
+    assert decoded_srid == srid
+    assert end == len(data)
+
+
+def test_geometry_wkb_drops_z_values():
+    data = L.geometry_wkb({'type': 'LineString', 'coordinates': [[1, 2, 3], [4, 5, 6]]})
+    assert read_wkb(data)[0]['coordinates'] == [[1, 2], [4, 5]]
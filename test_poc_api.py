@@ -0,0 +1,495 @@
+"""
+Tests for poc_api.
+
+The database is replaced by fakes. In the concurrency tests its queries
+only await a sleep, so the timings measure how the handlers share the
+event loop: a handler that blocked while its query ran would serialize
+every request behind it. The centre engine tests check CentreSnapshot
+against a plain-Python reading of centre_filters, and ilike_regex
+against SQLite's LIKE (same wildcards and backslash escapes as ILIKE).
+"""
+import asyncio
+import base64
+import json
+import sqlite3
+import time
+from contextlib import asynccontextmanager
+
+import httpx
+import pytest
+
+import poc_api
+
+SLOW_QUERY_S = 0.5
+DETAIL_QUERY_S = 0.05
+PARALLEL_REQUESTS = 10
+
+
+class FakeCursor:
+    """Async cursor: the centres GeoJSON query is slow, everything else is quick."""
+
+    def __init__(self, slow_queries):
+        self.slow_queries = slow_queries
+        self.query = ''
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, query, params=None):
+        self.query = query
+        slow = 'FeatureCollection' in query or self.slow_queries
+        await asyncio.sleep(SLOW_QUERY_S if slow else DETAIL_QUERY_S)
+
+    async def fetchone(self):
+        if 'FeatureCollection' in self.query:
+            return {'geojson': {'type': 'FeatureCollection', 'features': []}}
+        return {'location_id': '1', 'name': 'Test Centre'}
+
+
+class FakeConnection:
+    def __init__(self, slow_queries):
+        self.slow_queries = slow_queries
+
+    def cursor(self, **kwargs):
+        return FakeCursor(self.slow_queries)
+
+
+def fake_get_db(slow_queries=False):
+    @asynccontextmanager
+    async def get_db():
+        yield FakeConnection(slow_queries)
+    return get_db
+
+
+async def timed_get(client, path):
+    started = time.perf_counter()
+    response = await client.get(path)
+    assert response.status_code == 200, response.text
+    return time.perf_counter() - started
+
+
+def client():
+    transport = httpx.ASGITransport(app=poc_api.app)
+    return httpx.AsyncClient(transport=transport, base_url='http://test')
+
+
+def test_slow_query_does_not_delay_detail_requests(monkeypatch):
+    monkeypatch.setattr(poc_api, 'get_db', fake_get_db())
+
+    async def run():
+        async with client() as c:
+            slow = asyncio.create_task(timed_get(c, '/api/centres/geojson'))
+            await asyncio.sleep(0.05)  # the GeoJSON query is now in flight
+            details = await asyncio.gather(*(
+                timed_get(c, f'/api/centres/{i}') for i in range(PARALLEL_REQUESTS)
+            ))
+            return await slow, details
+
+    slow_s, detail_s = asyncio.run(run())
+    assert slow_s >= SLOW_QUERY_S
+    # Each detail request costs one quick query, not a wait for the slow one
+    assert max(detail_s) < SLOW_QUERY_S / 2
+
+
+def test_parallel_slow_detail_requests_overlap(monkeypatch):
+    monkeypatch.setattr(poc_api, 'get_db', fake_get_db(slow_queries=True))
+
+    async def run():
+        async with client() as c:
+            started = time.perf_counter()
+            await asyncio.gather(*(
+                timed_get(c, f'/api/centres/{i}') for i in range(PARALLEL_REQUESTS)
+            ))
+            return time.perf_counter() - started
+
+    elapsed = asyncio.run(run())
+    # Roughly one slow query in total, not PARALLEL_REQUESTS of them
+    assert elapsed < 2 * SLOW_QUERY_S
+
+
+def test_pool_timeout_is_503_on_wards(monkeypatch):
+    @asynccontextmanager
+    async def busy_get_db():
+        raise poc_api.PoolTimeout("no connection available")
+        yield
+
+    monkeypatch.setattr(poc_api, 'get_db', busy_get_db)
+
+    async def run():
+        async with client() as c:
+            return await c.get('/api/wards/geojson?zoom=11')
+
+    response = asyncio.run(run())
+    assert response.status_code == 503
+
+
+def test_ward_tiles_ignore_centre_filters(monkeypatch):
+    queries = []
+
+    class TileCursor(FakeCursor):
+        async def execute(self, query, params=None):
+            queries.append(query)
+
+        async def fetchone(self):
+            return (b'tile',)
+
+    class TileConnection(FakeConnection):
+        def cursor(self, **kwargs):
+            return TileCursor(False)
+
+    @asynccontextmanager
+    async def get_db():
+        yield TileConnection(False)
+
+    monkeypatch.setattr(poc_api, 'get_db', get_db)
+    poc_api.set_dataset_version(1)
+
+    async def run():
+        async with client() as c:
+            first = await c.get('/tiles/wards/12/1144/1494.mvt?activity=Swimming&weekday=2')
+            second = await c.get('/tiles/wards/12/1144/1494.mvt?district=Etobicoke')
+            return first, second
+
+    try:
+        first, second = asyncio.run(run())
+    finally:
+        poc_api.set_dataset_version(None)
+    assert first.content == second.content == b'tile'
+    # One tile query: no taxonomy lookup, and the second request is a cache hit
+    assert len(queries) == 1 and 'ST_AsMVT' in queries[0]
+
+
+def test_viewport_geojson_does_not_crowd_the_response_cache(monkeypatch):
+    monkeypatch.setattr(poc_api, 'get_db', fake_get_db())
+    poc_api.set_dataset_version(1)
+
+    async def run():
+        async with client() as c:
+            for path in ('/api/centres/geojson?bbox=-79.5,43.6,-79.4,43.7',
+                         '/api/centres/geojson?bbox=-79.6,43.6,-79.5,43.7',
+                         '/api/centres/geojson'):
+                response = await c.get(path)
+                assert response.status_code == 200, response.text
+
+    try:
+        asyncio.run(run())
+        assert len(poc_api.viewport_cache.entries) == 2
+        assert len(poc_api.response_cache.entries) == 1
+    finally:
+        poc_api.set_dataset_version(None)
+
+
+class StreamCursor:
+    """Server-side cursor over canned rows."""
+
+    def __init__(self, rows, log):
+        self.rows, self.log = rows, log
+
+    async def execute(self, query, params=None):
+        self.rows = [dict(row) for row in self.rows['dropin' if 'programs_dropin' in query else 'registered']]
+
+    async def fetchmany(self, size):
+        batch, self.rows = self.rows[:size], self.rows[size:]
+        self.log.append(len(batch))
+        return batch
+
+
+class StreamConnection:
+    def __init__(self, rows, log):
+        self.rows, self.log = rows, log
+
+    def cursor(self, name):
+        return StreamCursor(self.rows, self.log)
+
+
+def stream_db(rows, log):
+    @asynccontextmanager
+    async def get_db():
+        log.append('checkout')
+        try:
+            yield StreamConnection(rows, log)
+        finally:
+            log.append('release')
+    return get_db
+
+
+def test_unpaged_programs_stream_in_batches(monkeypatch):
+    dropins = [{'course_title': f'Swim {i}', 'sort_weekday': 0, 'sort_start': i, 'sort_id': i} for i in range(5)]
+    registered = [{'course_title': 'Pottery', 'sort_title': 'Pottery', 'sort_id': 1}]
+    log = []
+    monkeypatch.setattr(poc_api, 'get_db', stream_db({'dropin': dropins, 'registered': registered}, log))
+    monkeypatch.setattr(poc_api, 'STREAM_FETCH_ROWS', 2)
+
+    async def run():
+        async with client() as c:
+            return await c.get('/api/centres/1/programs')
+
+    response = asyncio.run(run())
+    assert response.status_code == 200
+    assert response.json() == {
+        'dropin': [{'course_title': f'Swim {i}'} for i in range(5)],
+        'registered': [{'course_title': 'Pottery'}],
+    }
+    # Both first batches before the body, then the rest two rows at a time, then the release
+    assert log == ['checkout', 2, 1, 2, 1, 'release']
+
+
+def test_pool_timeout_is_503_on_programs(monkeypatch):
+    @asynccontextmanager
+    async def busy_get_db():
+        raise poc_api.PoolTimeout("no connection available")
+        yield
+
+    monkeypatch.setattr(poc_api, 'get_db', busy_get_db)
+
+    async def run():
+        async with client() as c:
+            return await c.get('/api/centres/1/programs')
+
+    assert asyncio.run(run()).status_code == 503
+
+
+def raw_token(payload):
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip('=')
+
+
+@pytest.fixture
+def dataset_version():
+    poc_api.set_dataset_version(7)
+    yield 7
+    poc_api.set_dataset_version(None)
+
+
+@pytest.mark.parametrize('kind, key, key_types', [
+    ('centres', [12, 'Alpha Pool', 'L1'], poc_api.CENTRES_CURSOR_KEY),
+    ('centres', [0, None, 'L9'], poc_api.CENTRES_CURSOR_KEY),
+    ('programs:L1:dropin', [6, 86400, 2 ** 63 - 1], poc_api.DROPIN_CURSOR_KEY),
+    ('programs:L1:registered', ['Caf\u00e9 \u2615', 3], poc_api.REGISTERED_CURSOR_KEY),
+])
+def test_cursor_round_trip(dataset_version, kind, key, key_types):
+    token = poc_api.encode_cursor(kind, key)
+    assert '=' not in token
+    assert poc_api.decode_cursor(token, kind, key_types) == key
+
+
+@pytest.mark.parametrize('token', [
+    'not base64 at all!',
+    raw_token({'kind': 'centres'})[:-3],  # truncated
+    raw_token('centres'),
+    raw_token(['centres', 7]),
+    raw_token(['centres', 7, [12, 'Alpha Pool', 'L1'], 'extra']),
+    raw_token(['programs:L1:dropin', 7, [6, 3600, 1]]),  # another listing's token
+    raw_token(['centres', 7, [12, 'Alpha Pool']]),  # too short
+    raw_token(['centres', 7, [12, 'Alpha Pool', 'L1', 'L2']]),  # too long
+    raw_token(['centres', 7, ['12', 'Alpha Pool', 'L1']]),  # wrong type
+    raw_token(['centres', 7, [12.5, 'Alpha Pool', 'L1']]),
+    raw_token(['centres', 7, [True, 'Alpha Pool', 'L1']]),
+    raw_token(['centres', 7, [12, 'Alpha Pool', None]]),  # id is not nullable
+    raw_token(['centres', 7, [12, {'$gt': ''}, 'L1']]),
+    raw_token(['centres', 7, [2 ** 63, 'Alpha Pool', 'L1']]),  # past bigint
+    raw_token(['centres', 7, [12, 'Alpha\x00Pool', 'L1']]),
+    raw_token(['centres', 7, {'total': 12}]),
+    base64.urlsafe_b64encode(b'[' * 100000).decode(),  # nested too deep
+    raw_token(['centres', 7, list(range(10000))]),  # oversized key
+])
+def test_forged_cursors_are_400(dataset_version, token):
+    with pytest.raises(poc_api.HTTPException) as caught:
+        poc_api.decode_cursor(token, 'centres', poc_api.CENTRES_CURSOR_KEY)
+    assert caught.value.status_code == 400
+
+
+def test_cursor_from_older_dataset_is_410(dataset_version):
+    token = poc_api.encode_cursor('centres', [12, 'Alpha Pool', 'L1'])
+    poc_api.set_dataset_version(dataset_version + 1)
+    with pytest.raises(poc_api.HTTPException) as caught:
+        poc_api.decode_cursor(token, 'centres', poc_api.CENTRES_CURSOR_KEY)
+    assert caught.value.status_code == 410
+
+
+def test_forged_cursor_is_400_over_http(dataset_version):
+    async def run():
+        async with client() as c:
+            return await c.get('/api/centres', params={'cursor': raw_token(['centres', 7, ['x', 'y', 'z']])})
+
+    assert asyncio.run(run()).status_code == 400
+
+
+SQL = sqlite3.connect(':memory:')
+
+
+def sql_like(value, pattern):
+    """value ILIKE pattern, for ASCII text (SQLite's LIKE is case-insensitive there)."""
+    return value is not None and SQL.execute("SELECT ? LIKE ? ESCAPE '\\'", (value, pattern)).fetchone()[0] == 1
+
+
+@pytest.mark.parametrize('value, pattern', [
+    ('Lane Swim', '%swim%'), ('Lane Swim', 'lane_swim'), ('Lane Swim', 'lane%'), ('Lane Swim', '%lane'),
+    ('Lane\nSwim', 'lane_swim'), ('50% off', '%50\\%%'), ('500 off', '%50\\%%'),
+    ('a_b', 'a\\_b'), ('axb', 'a\\_b'), ('a\\b', 'a\\\\b'), ('ab', '\\a\\b'),
+    ('a.b*c', 'a.b*c'), ('aXbc', 'a.b*c'), ('(x)', '(_)'), ('', '%'), ('', '_'),
+])
+def test_ilike_regex_matches_sql_like(value, pattern):
+    assert bool(poc_api.ilike_regex(pattern).fullmatch(value)) == sql_like(value, pattern)
+
+
+# (location_id, name, district, facility_type, lon, lat), in location_id order
+CENTRES = [
+    ('L1', 'Alpha Pool', 'Etobicoke', 'Pool', -79.5, 43.6),
+    ('L2', 'Beta Park', 'Scarborough', 'Park', -79.2, 43.8),
+    ('L3', 'Beta Park', 'Scarborough', 'Community Centre', -79.25, 43.75),
+    ('L4', None, 'North York', '100% Fun', -79.4, 43.75),
+    ('L5', 'Gamma CC', 'Etobicoke', None, -79.55, 43.65),
+]
+# (location_id, weekday, course_title, activity); X9 is not a served centre
+DROPINS = [
+    ('L1', 0, 'Lane Swim', 'Swimming'), ('L1', 2, 'Lane Swim', 'Swimming'), ('L1', 2, 'Aquafit', 'Fitness'),
+    ('L2', 0, 'Leisure Swim', 'Swimming'), ('L2', 4, 'Pickleball', 'Racquet Sports'),
+    ('L3', 2, 'Lane Swim', 'Swimming'), ('L4', None, 'Open Gym', 'Sports'), ('X9', 1, 'Lane Swim', 'Swimming'),
+]
+# (location_id, course_title, activity_title, activity)
+REGISTERED = [
+    ('L1', 'Swim Lessons', 'Learn to Swim', 'Swimming'), ('L3', 'Pottery', 'Arts 50%_off', 'Arts'),
+    ('L5', 'Lane Swim Club', None, 'Swimming'), ('L5', 'Chess', None, None),
+]
+TAXONOMY = {activity.lower(): activity for *_, activity in DROPINS + REGISTERED if activity}
+BBOX = '-79.45,43.7,-79.1,43.9'
+
+
+def snapshot_rows():
+    names = sorted({name for _, name, *_ in CENTRES if name is not None})
+    locations = []
+    for id_rank, (location_id, name, district, facility_type, lon, lat) in enumerate(CENTRES, 1):
+        series = [row for row in DROPINS if row[0] == location_id]
+        locations.append({
+            'location_id': location_id, 'name': name, 'address': None, 'district': district,
+            'facility_type': facility_type, 'accessibility': None, 'phone': None, 'url': None,
+            'lon': lon, 'lat': lat, 'geometry': {'type': 'Point', 'coordinates': [lon, lat]},
+            'dropin_count': len(series),
+            'registered_count': sum(row[0] == location_id for row in REGISTERED),
+            'weekday_counts': [sum(row[1] == day for row in series) for day in range(7)],
+            # dense_rank() over the name sorts NULLs last
+            'name_rank': names.index(name) + 1 if name is not None else len(names) + 1,
+            'id_rank': id_rank,
+        })
+    dropins = [dict(zip(('location_id', 'weekday', 'course_title', 'activity'), row)) for row in DROPINS]
+    registered = [dict(zip(('location_id', 'course_title', 'activity_title', 'activity'), row)) for row in REGISTERED]
+    return locations, dropins, registered
+
+
+def reference_counts(activity=None, weekday=None, district=None, facility_type=None, bbox=None):
+    """centre_filters read literally: {location_id: (dropin_count, registered_count)} of matching centres."""
+    name = TAXONOMY.get(activity.strip().lower()) if activity and activity.strip() else None
+    term = f'%{activity}%'
+    box = [float(v) for v in bbox.split(',')] if bbox else None
+    counts = {}
+    for location_id, _, centre_district, centre_facility_type, lon, lat in CENTRES:
+        series = [row for row in DROPINS if row[0] == location_id]
+        registered = [row for row in REGISTERED if row[0] == location_id]
+        dropin_count, registered_count = len(series), len(registered)
+        keep = True
+        if weekday is not None:
+            dropin_count = sum(row[1] == weekday for row in series)
+            keep = dropin_count > 0
+        if activity:
+            dropin_count = sum(
+                (row[3] == name if name else sql_like(row[2], term)) and weekday in (None, row[1])
+                for row in series
+            )
+            registered_count = sum(
+                row[3] == name if name else sql_like(row[1], term) or sql_like(row[2], term)
+                for row in registered
+            )
+            keep = dropin_count > 0 if weekday is not None else dropin_count + registered_count > 0
+        if district and centre_district != district:
+            keep = False
+        if facility_type and not sql_like(centre_facility_type, f'%{facility_type}%'):
+            keep = False
+        if box and not (box[0] <= lon <= box[2] and box[1] <= lat <= box[3]):
+            keep = False
+        if keep:
+            counts[location_id] = (dropin_count, registered_count)
+    return counts
+
+
+class TitleCursor:
+    """Answers the engine's title lookups; ILIKE only (no pg_trgm here)."""
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, query, params=None):
+        pattern = params['activity']
+        if 'dropin_series' in query:
+            self.rows = {(row[2],) for row in DROPINS if sql_like(row[2], pattern)}
+        else:
+            self.rows = {(row[1], row[2]) for row in REGISTERED if sql_like(row[1], pattern) or sql_like(row[2], pattern)}
+
+    async def fetchall(self):
+        return sorted(self.rows, key=repr)
+
+
+class TitleConnection:
+    def cursor(self, **kwargs):
+        return TitleCursor()
+
+
+@asynccontextmanager
+async def title_db():
+    yield TitleConnection()
+
+
+ENGINE_FILTERS = [
+    {}, {'weekday': 2}, {'weekday': 5},
+    {'activity': 'Swimming'}, {'activity': ' swimming ', 'weekday': 0},
+    {'activity': 'swim'}, {'activity': 'swim', 'weekday': 2}, {'activity': 'LANE_SWIM'},
+    {'activity': '50\\%'}, {'activity': 'pottery', 'weekday': 2},
+    {'district': 'Scarborough'}, {'district': 'Nowhere'},
+    {'facility_type': 'p__l'}, {'facility_type': '100\\%'}, {'facility_type': '%'},
+    {'bbox': BBOX}, {'activity': 'Swimming', 'district': 'Scarborough', 'bbox': BBOX},
+]
+
+
+@pytest.fixture
+def snapshot(monkeypatch):
+    monkeypatch.setattr(poc_api, 'get_db', title_db)
+    poc_api.set_dataset_version(1)
+    yield poc_api.CentreSnapshot.from_rows(1, *snapshot_rows())
+    poc_api.set_dataset_version(None)
+
+
+@pytest.mark.parametrize('filters', ENGINE_FILTERS)
+def test_engine_geojson_matches_centre_filters(snapshot, filters):
+    collection = asyncio.run(snapshot.geojson(**filters))
+    features = [feature['properties'] for feature in collection['features']]
+    expected = reference_counts(**filters)
+    # Features come in location_id order, as the SQL's jsonb_agg(... ORDER BY location_id)
+    assert [p['id'] for p in features] == list(expected)
+    assert {p['id']: (p['dropin_count'], p['registered_count']) for p in features} == expected
+    assert all(p['total_programs'] == p['dropin_count'] + p['registered_count'] for p in features)
+
+
+@pytest.mark.parametrize('filters', ENGINE_FILTERS)
+def test_engine_pages_follow_cursors(snapshot, filters):
+    names = {location_id: name for location_id, name, *_ in CENTRES}
+    expected = sorted(
+        reference_counts(**filters).items(),
+        key=lambda item: (-sum(item[1]), names[item[0]] is None, names[item[0]] or '', item[0]),
+    )
+
+    async def walk():
+        seen, after = [], None
+        while True:
+            page = await snapshot.centres(2, after=after, **filters)
+            assert len(page['items']) <= 2
+            seen += [(item['location_id'], (item['dropin_count'], item['registered_count'])) for item in page['items']]
+            if page['next_cursor'] is None:
+                return seen
+            after = poc_api.decode_cursor(page['next_cursor'], 'centres', poc_api.CENTRES_CURSOR_KEY)
+
+    assert asyncio.run(walk()) == expected
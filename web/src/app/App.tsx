@@ -4,12 +4,13 @@ import Legend from '../features/legend/ui/Legend';
 import FiltersPanel from '../features/filters/ui/FiltersPanel';
 import DetailsSidebar from '../features/centres/ui/DetailsSidebar';
 import type { AgeFilter, CentresFeatureCollection, WardFeatureCollection } from '../shared/types';
-import { getWards } from '../features/centres/api/centres.api';
+import { getWards, wardLevelZoom } from '../features/centres/api/centres.api';
 import { useCentres } from '../features/centres/hooks/useCentres';
 
 export default function App() {
   const [filters, setFilters] = useState({ activity:'', district:'', weekday:'', age:'' as AgeFilter, facility_type:'' });
   const [wards, setWards] = useState<WardFeatureCollection | null>(null);
+  const [wardZoom, setWardZoom] = useState(wardLevelZoom(11));
   const [selectedCentreId, setSelectedCentreId] = useState<string|number|null>(null);
   const [layersVisible, setLayersVisible] = useState({ centres: true, wards: true });
   const [userLocation, setUserLocation] = useState<[number, number] | null>(null);
@@ -17,13 +18,17 @@ export default function App() {
 
   const { data: centres, loading: centresLoading, refetch } = useCentres(filters);
 
+  // Outlines are simplified per zoom level; fetch the matching level when it changes
   useEffect(() => {
+    let stale = false;
     (async () => {
-      const w = await getWards();
+      const w = await getWards(wardZoom);
+      if (stale) return;
       setWards(w);
-      setStatus('Map loaded! Click markers for details.');
+      setStatus(s => s === 'Loading map...' ? 'Map loaded! Click markers for details.' : s);
     })();
-  }, []);
+    return () => { stale = true; };
+  }, [wardZoom]);
 
   const onSearch = () => refetch();
   const onReset = () => {
@@ -48,6 +53,7 @@ export default function App() {
         onCentreClick={setSelectedCentreId}
         layersVisible={layersVisible}
         userLocation={userLocation}
+        onZoomChange={(zoom) => setWardZoom(wardLevelZoom(zoom))}
       />
 
       <FiltersPanel
@@ -2,12 +2,21 @@ import { get } from '../../../shared/lib/http';
 import type {
   ActivityOption, DistrictOption, FacilityTypeOption,
   WardFeatureCollection, CentresFeatureCollection,
-  CentreDetail, CentrePrograms, CentreFacility
+  CentreDetail, CentrePrograms, CentreFacility, CentreBundle, CentreBundles
 } from '../../../shared/types/index.ts';
 import { mapRegisteredCsvRow } from '../../../shared/lib/registered.adapter';
 import type { RegisteredCsvRow, RegisteredProgram } from '../../../shared/types';
 
-export const getWards = () => get<WardFeatureCollection>('/api/wards/geojson');
+// Zooms at which the API switches to a more detailed ward outline
+// (min_zoom of WARD_LEVELS in load_poc_data.py).
+const WARD_LEVEL_ZOOMS = [0, 12, 14, 16];
+
+// The lowest zoom serving the same outlines as `zoom`; refetch wards when it changes.
+export const wardLevelZoom = (zoom: number) =>
+  WARD_LEVEL_ZOOMS.filter(z => z <= zoom).pop() ?? 0;
+
+export const getWards = (zoom = 11) =>
+  get<WardFeatureCollection>(`/api/wards/geojson?zoom=${wardLevelZoom(zoom)}`);
 
 export async function getFilterOptions() {
   const [activities, districts, facilityTypes] = await Promise.all([
@@ -31,24 +40,19 @@ export const getCentrePrograms   = (id: string|number) => get<CentrePrograms>(`/
 export const getCentreFacilities = (id: string|number) => get<CentreFacility[]>(`/api/centres/${id}/facilities`);
 
 
+// Detail, programs, facilities and program types for many centres in one request
+export const getCentreBundles = (ids: Array<string|number>) =>
+  get<CentreBundles>(`/api/centres/bundle?ids=${ids.map(id => encodeURIComponent(String(id))).join(',')}`);
+
+export async function getCentreBundle(id: string|number): Promise<CentreBundle|null> {
+  const { centres } = await getCentreBundles([id]);
+  return centres[String(id)] ?? null;
+}
+
 export async function getCentreRegisteredPrograms(
   id: string | number
 ): Promise<RegisteredProgram[]> {
-  // 1) Try a dedicated endpoint if it exists
-  try {
-    const res = await get<any>(`/api/centres/${id}/registered`);
-    const rows: RegisteredCsvRow[] = Array.isArray(res)
-      ? res
-      : (res.rows ?? res.programs ?? res.registered ?? []);
-    if (rows?.length) return rows.map(mapRegisteredCsvRow);
-  } catch {
-    // ignore and fall through
-  }
-
-  // 2) Fallback: pull from /programs payload
-  const payload = await get<any>(`/api/centres/${id}/programs`);
-  const rows: RegisteredCsvRow[] = Array.isArray(payload)
-    ? payload
-    : (payload.registered ?? payload.rows ?? payload.programs ?? []);
-  return (rows ?? []).map(mapRegisteredCsvRow);
-}
\ No newline at end of file
+  const bundle = await getCentreBundle(id);
+  const rows = (bundle?.registered ?? []) as unknown as RegisteredCsvRow[];
+  return rows.map(mapRegisteredCsvRow);
+}
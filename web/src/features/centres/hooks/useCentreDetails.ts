@@ -3,7 +3,7 @@ import type {
   AgeFilter, CentreDetail, CentreFacility, CentrePrograms,
   DropInProgram, ProgramRegistered
 } from '../../../shared/types';
-import { getCentreDetail, getCentreFacilities, getCentrePrograms } from '../api/centres.api';
+import { getCentreBundle } from '../api/centres.api';
 
 function filterByAge<T extends DropInProgram|ProgramRegistered>(programs: T[], age: AgeFilter) {
   if (!age) return programs;
@@ -30,8 +30,10 @@ export function useCentreDetails(id: string|number|null, age: AgeFilter) {
     if (!id) return;
     (async () => {
       setLoading(true);
-      const [d, p, f] = await Promise.all([ getCentreDetail(id), getCentrePrograms(id), getCentreFacilities(id) ]);
-      setDetail(d); setProgramsRaw(p); setFacilities(f);
+      const bundle = await getCentreBundle(id);
+      setDetail(bundle?.detail ?? null);
+      setProgramsRaw(bundle ? { dropin: bundle.dropin, registered: bundle.registered } : null);
+      setFacilities(bundle?.facilities ?? []);
       setLoading(false);
     })();
   }, [id]);
@@ -11,13 +11,16 @@ type Props = {
   onCentreClick: (id: string | number) => void;
   layersVisible: { centres: boolean; wards: boolean };
   userLocation?: [number, number] | null;
+  onZoomChange?: (zoom: number) => void;
 };
 
-export default function MapView({ centres, wards, onCentreClick, layersVisible, userLocation }: Props) {
+export default function MapView({ centres, wards, onCentreClick, layersVisible, userLocation, onZoomChange }: Props) {
   const mapRef = useRef<MaplibreMap | null>(null);
   const containerRef = useRef<HTMLDivElement | null>(null);
   const userMarkerRef = useRef<maplibregl.Marker | null>(null);
   const [mapReady, setMapReady] = useState(false);
+  const onZoomChangeRef = useRef(onZoomChange);
+  onZoomChangeRef.current = onZoomChange;
 
   useEffect(() => {
     if (mapRef.current || !containerRef.current) return;
@@ -38,6 +41,7 @@ export default function MapView({ centres, wards, onCentreClick, layersVisible,
       center: [-79.3832, 43.6532], zoom: 11
     });
     map.on('load', () => setMapReady(true));
+    map.on('zoomend', () => onZoomChangeRef.current?.(map.getZoom()));
     mapRef.current = map;
     return () => {
       setMapReady(false);
@@ -1,17 +1,14 @@
 import type { DropInProgram } from "../../shared/types";
 
-// If backend lacks activity, infer from course title.
-function fallbackActivityFromTitle(title: string): string {
-  const lower = title.toLowerCase();
-  const known = ["badminton","basketball","pickleball","table tennis","swim","yoga","dance","gym"];
-  const hit = known.find(k => lower.includes(k));
-  return hit ? (hit === "table tennis" ? "Table Tennis" : hit[0].toUpperCase() + hit.slice(1)) : "Other";
+// Activities are classified by the loader; the API sends them on every program.
+function activityOf(p: DropInProgram): string {
+  return (p.activity && p.activity.trim()) || "Other";
 }
 
 export function getSports(programs: DropInProgram[]): string[] {
   const set = new Set<string>();
   for (const p of programs) {
-    const sport = (p.activity && p.activity.trim()) || fallbackActivityFromTitle(p.course_title);
+    const sport = activityOf(p);
     set.add(sport);
   }
   return Array.from(set).sort((a,b) => a.localeCompare(b));
@@ -34,7 +31,7 @@ export function scheduleKey(p: DropInProgram): ScheduleKey {
 export function getSchedulesForSport(programs: DropInProgram[], sport: string): ScheduleKey[] {
   const set = new Set<ScheduleKey>();
   for (const p of programs) {
-    const s = (p.activity && p.activity.trim()) || fallbackActivityFromTitle(p.course_title);
+    const s = activityOf(p);
     if (s === sport) set.add(scheduleKey(p));
   }
   return Array.from(set).sort();
@@ -46,7 +43,7 @@ export function filterBySportAndSchedule(
   sk?: ScheduleKey | null
 ): DropInProgram[] {
   return programs.filter(p => {
-    const s = (p.activity && p.activity.trim()) || fallbackActivityFromTitle(p.course_title);
+    const s = activityOf(p);
     if (sport && s !== sport) return false;
     if (sk) return scheduleKey(p) === sk;
     return true;
@@ -21,7 +21,7 @@ export interface CentresFeatureCollection {
   }>;
 }
 
-export interface ActivityOption { activity: string; count: number }
+export interface ActivityOption { activity: string; category?: string; count: number }
 export interface DistrictOption { district: string; location_count: number }
 export interface FacilityTypeOption { facility_type: string; count: number }
 
@@ -37,6 +37,7 @@ export interface DropInProgram {
   centre_id?: string | number;
   course_title: string;
   activity?: string | null;      
+  activity_category?: string | null;
   day_of_week?: string | null;   
   start_time?: string | null; 
   end_time?: string | null; 
@@ -49,6 +50,17 @@ export interface ProgramRegistered {
 }
 export interface CentrePrograms { dropin: DropInProgram[]; registered: ProgramRegistered[] }
 export interface CentreFacility { facility_type: string }
+export interface ProgramTypeSummary { program_type: 'dropin' | 'registered'; titles: string[]; count: number }
+
+// One centre from /api/centres/bundle; `dropin` holds recurring drop-in series
+export interface CentreBundle {
+  detail: CentreDetail;
+  dropin: DropInProgram[];
+  registered: ProgramRegistered[];
+  facilities: CentreFacility[];
+  program_types: { dropin: ProgramTypeSummary; registered: ProgramTypeSummary };
+}
+export interface CentreBundles { centres: Record<string, CentreBundle>; missing: string[] }
 
 export type AgeFilter = '' | 'young' | 'teen' | 'adult' | 'senior';
 
@@ -83,6 +95,7 @@ export interface RegisteredProgram extends ProgramRegistered {
 
   // Optional activity/sport bucket
   activity?: string | null;
+  activity_category?: string | null;
   sport?: string | null;
 
   // --- Add these normalized fields used by the UI ---